@@ -4,50 +4,99 @@ Flask API 服务 - 事件驱动架构演示
 """
 
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from datetime import datetime
-from typing import List, Dict, Any
+from collections import deque
+import threading
+from typing import Deque, Dict, Any, Optional
 
 from core.event import EventBus, Event
+from core import json_codec
 from core.event_policy import can_receive_from_frontend, is_sensitive_event
 from core.config_loader import config
 from core.event import auto_register_listeners
 
 
+class LenientJSONProvider(DefaultJSONProvider):
+    """JSON 提供者 - 无法序列化的值（如监听器返回的任意对象）回退为字符串"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        try:
+            return DefaultJSONProvider.default(o)
+        except TypeError:
+            return str(o)
+
+
 # 创建Flask应用
 app = Flask(__name__)
+app.json = LenientJSONProvider(app)
 CORS(app)  # 允许跨域
 
 # 创建SocketIO实例 - 实现WebSocket支持
 socketio = SocketIO(
     app,
     cors_allowed_origins=config.websocket.cors_origins,
-    async_mode=config.websocket.async_mode
+    async_mode=config.websocket.async_mode,
+    json=json_codec  # 使用 orjson 编解码 Socket.IO 数据包
 )
 
 # 创建全局事件总线
-event_bus = EventBus()
+event_bus = EventBus(max_workers=config.event_system.worker_threads)
 
-# 事件历史记录（用于演示）
-event_history: List[Dict[str, Any]] = []
+# 事件历史记录（用于演示），只保留最近N条
+event_history: Deque[Dict[str, Any]] = deque(maxlen=config.event_system.max_history)
 
 # WebSocket连接计数
 connected_clients = 0
 
+# 广播队列：同一时刻产生的广播合并到一个后台任务中分批发送
+BROADCAST_BATCH_SIZE: int = config.websocket.broadcast_batch_size or 50
+_broadcast_queue: Deque[str] = deque()  # 入队时编码好的 JSON 快照
+_broadcast_lock = threading.Lock()
+_broadcast_flush_pending = False
+
 
 # ============= 中间件 =============
 
+# 中间件使用的配置项，启动时解析一次，避免每个事件都访问 config
+_log_verbose: bool = config.logging.verbose
+
+
+def configure_logging_middleware(
+    verbose: Optional[bool] = None,
+    max_history: Optional[int] = None
+) -> None:
+    """
+    更新日志中间件配置
+
+    应用本身不会调用；供运行时重新加载配置的代码使用，例如重新读取 config.yaml 后:
+        new_config = load_config()
+        configure_logging_middleware(
+            verbose=new_config.logging.verbose,
+            max_history=new_config.event_system.max_history
+        )
+
+    Args:
+        verbose: 是否打印每个事件（None 保持不变）
+        max_history: 事件历史最大保留数量，保留最近的记录（None 保持不变）
+    """
+    global _log_verbose, event_history
+    if verbose is not None:
+        _log_verbose = verbose
+    if max_history is not None:
+        event_history = deque(event_history, maxlen=max_history)
+
+
 def logging_middleware(event: Event) -> Event:
     """日志中间件 - 记录所有事件"""
-    if config.logging.verbose:
+    if _log_verbose:
         print(f"[{event.timestamp}] Event: {event.name} | Data: {event.data}")
 
+    # deque 自动丢弃超出 maxlen 的旧记录
     event_history.append(event.to_dict())
-    # 只保留最近N条
-    max_history = config.event_system.max_history
-    if len(event_history) > max_history:
-        event_history.pop(0)
     return event
 
 
@@ -71,17 +120,72 @@ def websocket_broadcast_middleware(event: Event) -> Event:
             print(f"⚠️  警告: 敏感事件 {event.name} 正在广播到前端！建议使用 scope='local'")
 
         print(f"📡 准备广播事件到前端: {event.name} (当前连接数: {connected_clients})")
-        # 使用 socketio.emit() 进行广播到所有客户端
-        # 注意：在中间件中调用需要使用 to= 参数或在应用上下文中
-        with app.app_context():
-            socketio.emit('event', event.to_dict(), namespace='/')
-        print(f"📡 广播事件完成: {event.name} (scope={event.scope})")
+        # 加入广播队列，由后台任务统一发送，避免在事件派发中串行写网络
+        _queue_broadcast(event.to_dict())
+        print(f"📡 广播事件已入队: {event.name} (scope={event.scope})")
     elif event.scope == 'local':
         print(f"📍 事件 {event.name} 仅后端本地处理 (scope=local)")
 
     return event
 
 
+def _queue_broadcast(payload: Dict[str, Any]) -> None:
+    """
+    将广播加入队列，必要时启动后台发送任务
+
+    入队时编码为 JSON 作为快照：后台线程发送时，监听器可能仍在修改原始的 data/metadata。
+    所有广播（事件自身与监听器请求的）都经由此队列，按入队顺序发送
+    """
+    global _broadcast_flush_pending
+    try:
+        encoded = json_codec.dumps(payload, separators=(',', ':'))
+    except Exception as e:
+        print(f"❌ 广播事件无法入队: {payload.get('name')} ({e})")
+        return
+    with _broadcast_lock:
+        _broadcast_queue.append(encoded)
+        if _broadcast_flush_pending:
+            return
+        _broadcast_flush_pending = True
+    try:
+        socketio.start_background_task(_flush_broadcasts)
+    except Exception as e:
+        # 启动失败时复位标记，下一次广播会重新尝试启动发送任务
+        with _broadcast_lock:
+            _broadcast_flush_pending = False
+        print(f"❌ 无法启动广播发送任务: {e}")
+
+
+def _flush_broadcasts() -> None:
+    """后台任务：分批发送队列中的广播，每批之间让出执行权"""
+    global _broadcast_flush_pending
+    drained = False
+    try:
+        with app.app_context():
+            while True:
+                with _broadcast_lock:
+                    if not _broadcast_queue:
+                        _broadcast_flush_pending = False
+                        drained = True
+                        return
+                    batch = [
+                        _broadcast_queue.popleft()
+                        for _ in range(min(BROADCAST_BATCH_SIZE, len(_broadcast_queue)))
+                    ]
+                for encoded in batch:
+                    # 单条广播失败不能中断整个队列
+                    try:
+                        socketio.emit('event', json_codec.loads(encoded), namespace='/')
+                    except Exception as e:
+                        print(f"❌ 广播事件失败: {encoded[:100]} ({e})")
+                socketio.sleep(0)
+    finally:
+        # 任务意外退出时也要复位标记，否则后续广播不会再启动发送任务
+        if not drained:
+            with _broadcast_lock:
+                _broadcast_flush_pending = False
+
+
 def validation_middleware(event: Event) -> Event:
     """验证中间件 - 为事件添加元数据"""
     event.metadata['validated'] = True
@@ -110,7 +214,7 @@ def init_event_system():
     # auto_register_listeners(listeners_module, event_bus)
 
     print("✓ 事件系统初始化完成")
-    print(f"✓ 已注册监听器: {len(event_bus._listeners)} 个事件类型")
+    print(f"✓ 已注册监听器: {len(event_bus._callables)} 个事件类型")
 
 
 # ============= API 路由 =============
@@ -122,13 +226,27 @@ def health_check():
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'event_system': {
-            'listeners_count': sum(len(v) for v in event_bus._listeners.values()),
-            'event_types': list(event_bus._listeners.keys()),
-            'wildcard_listeners': len(event_bus._wildcard_listeners)
+            'listeners_count': sum(len(v) for v in event_bus._callables.values()),
+            'event_types': list(event_bus._callables.keys()),
+            'wildcard_listeners': len(event_bus._wildcard_callables)
         }
     })
 
 
+def _jsonable_result(result: Any) -> Any:
+    """
+    监听器返回值能被 JSON 序列化时原样返回，否则转为字符串
+
+    LenientJSONProvider 只能处理无法序列化的值，处理不了无法排序或非字符串的字典键
+    （如 {1: 'a', 'b': 2}），因此逐个预先检查
+    """
+    try:
+        app.json.dumps(result)
+    except Exception:
+        return str(result)
+    return result
+
+
 @app.route('/api/events', methods=['POST'])
 def emit_event():
     """
@@ -161,7 +279,7 @@ def emit_event():
             'success': True,
             'event': event.to_dict(),
             'listeners_executed': len(results),
-            'results': [str(r) for r in results if r is not None],
+            'results': [_jsonable_result(r) for r in results],
             'scope': event.scope
         })
 
@@ -175,7 +293,7 @@ def get_event_history():
     limit = request.args.get('limit', config.api.default_history_limit, type=int)
     limit = min(limit, config.api.max_history_limit)  # 限制最大值
     return jsonify({
-        'events': event_history[-limit:],
+        'events': list(event_history)[-limit:],
         'total': len(event_history)
     })
 
@@ -192,18 +310,18 @@ def get_listeners():
     """获取所有监听器信息"""
     listeners_info = {}
 
-    for event_name, listeners in event_bus._listeners.items():
+    for event_name, listeners in event_bus._callables.items():
         listeners_info[event_name] = [
             {
                 'name': listener.__name__ if hasattr(listener, '__name__') else str(listener),
                 'priority': priority
             }
-            for listener, priority in listeners
+            for listener, priority in zip(listeners, event_bus._priorities[event_name])
         ]
 
     return jsonify({
         'listeners': listeners_info,
-        'wildcard_listeners': len(event_bus._wildcard_listeners)
+        'wildcard_listeners': len(event_bus._wildcard_callables)
     })
 
 
@@ -274,7 +392,7 @@ def handle_frontend_event(data):
             if isinstance(result, dict) and 'broadcast' in result:
                 broadcast_data = result['broadcast']
                 print(f"📡 监听器请求广播: {broadcast_data.get('name')}")
-                emit('event', broadcast_data, broadcast=True)
+                _queue_broadcast(broadcast_data)
 
         # 响应前端
         emit('event_result', {
@@ -316,10 +434,13 @@ if __name__ == '__main__':
     print(f"   - subscribe                    订阅事件")
     print("="*50 + "\n")
 
-    socketio.run(
-        app,
-        debug=config.server.debug,
-        host=config.server.host,
-        port=config.server.port,
-        allow_unsafe_werkzeug=True
-    )
\ No newline at end of file
+    try:
+        socketio.run(
+            app,
+            debug=config.server.debug,
+            host=config.server.host,
+            port=config.server.port,
+            allow_unsafe_werkzeug=True
+        )
+    finally:
+        event_bus.close()
\ No newline at end of file
@@ -8,19 +8,20 @@ from typing import Any, Dict
 
 
 class Config:
-    """配置类 - 支持点号访问"""
+    """配置类 - 支持点号访问（加载时一次性绑定为实例属性）"""
 
     def __init__(self, data: Dict[str, Any]):
         self._data = data
+        # 预先把每个键绑定为属性，嵌套字典递归转换，访问时不再创建新对象
+        for key, value in data.items():
+            if isinstance(key, str) and not key.startswith('_') and not hasattr(Config, key):
+                setattr(self, key, _freeze(value))
 
     def __getattr__(self, name: str) -> Any:
+        # 仅在属性不存在时调用：未配置的键返回 None
         if name.startswith('_'):
-            return object.__getattribute__(self, name)
-
-        value = self._data.get(name)
-        if isinstance(value, dict):
-            return Config(value)
-        return value
+            raise AttributeError(name)
+        return None
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值，支持默认值"""
@@ -31,6 +32,13 @@ class Config:
         return self._data
 
 
+def _freeze(value: Any) -> Any:
+    """递归地把字典转换为 Config"""
+    if isinstance(value, dict):
+        return Config(value)
+    return value
+
+
 def load_config(config_path: str = 'config.yaml') -> Config:
     """
     加载配置文件
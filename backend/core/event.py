@@ -9,10 +9,14 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Optional, Protocol
-from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import contextvars
+import heapq
+import threading
 
 
 # ============= 事件协议 (鸭子类型支持) =============
@@ -26,9 +30,14 @@ class EventProtocol(Protocol):
 
 # ============= 事件基类 =============
 
-@dataclass
-class Event(ABC):
-    """事件抽象基类"""
+class _DictCacheSlot:
+    """为 Event 提供 to_dict 缓存槽（不作为 dataclass 字段出现）及弱引用支持"""
+    __slots__ = ('_dict_cache', '__weakref__')
+
+
+@dataclass(slots=True)
+class Event(_DictCacheSlot):
+    """事件基类（使用 __slots__，不创建实例 __dict__）"""
     name: str
     data: Dict[str, Any] = field(default_factory=dict)
     timestamp: datetime = field(default_factory=datetime.now)
@@ -39,16 +48,40 @@ class Event(ABC):
         """事件创建后的钩子"""
         if not self.name:
             self.name = self.__class__.__name__
+        self._dict_cache = None
+
+    def __getstate__(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """复制/序列化时只保留字段，不携带 to_dict 缓存"""
+        return (
+            getattr(self, '__dict__', None) or None,
+            {f.name: getattr(self, f.name) for f in fields(self)}
+        )
 
     def to_dict(self) -> Dict[str, Any]:
-        """序列化为字典"""
-        return {
-            "name": self.name,
-            "data": self.data,
-            "timestamp": self.timestamp.isoformat(),
-            "metadata": self.metadata,
-            "scope": self.scope
+        """
+        序列化为字典
+
+        结果会被缓存，日志、广播和 API 响应共享同一个字典（event_history 中保存的也是它），
+        调用方不得修改返回值。缓存记录了构建时的各字段对象，读取时逐一按身份比较，
+        任一字段被重新赋值即重建；data/metadata 的原地修改会直接反映在缓存中（字典引用相同）
+        """
+        # 缓存槽不在 dataclass 字段中，由 __post_init__ 初始化；
+        # 子类重写 __post_init__ 且未调用父类时槽可能未赋值，需带默认值读取
+        cached = getattr(self, '_dict_cache', None)
+        name, data, timestamp, metadata, scope = self.name, self.data, self.timestamp, self.metadata, self.scope
+        if (cached is not None and cached[0] is name and cached[1] is data
+                and cached[2] is timestamp and cached[3] is metadata and cached[4] is scope):
+            return cached[5]
+
+        result = {
+            "name": name,
+            "data": data,
+            "timestamp": timestamp.isoformat(),
+            "metadata": metadata,
+            "scope": scope
         }
+        self._dict_cache = (name, data, timestamp, metadata, scope, result)
+        return result
 
 
 # ============= 监听器协议 =============
@@ -85,6 +118,22 @@ class AsyncEventListener(ABC):
         return await self.handle(event)
 
 
+# ============= 监听器类型 =============
+
+_SYNC = 0          # 同步可调用对象，在线程池中执行
+_ASYNC_FN = 1      # 协程函数
+_ASYNC_HANDLE = 2  # 带异步 handle 方法的对象（如 AsyncEventListener）
+
+
+def _listener_kind(listener: Callable) -> int:
+    """订阅时判定监听器类型，避免每次派发都做反射检查"""
+    if asyncio.iscoroutinefunction(listener):
+        return _ASYNC_FN
+    if asyncio.iscoroutinefunction(getattr(listener, 'handle', None)):
+        return _ASYNC_HANDLE
+    return _SYNC
+
+
 # ============= 事件总线 =============
 
 class EventBus:
@@ -98,10 +147,29 @@ class EventBus:
     - 中间件支持
     """
 
-    def __init__(self):
-        self._listeners: Dict[str, List[tuple[Callable, int]]] = {}  # {event_name: [(listener, priority)]}
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: 异步发布时执行同步监听器的线程池大小（None 使用默认值）
+        """
+        # 监听器按优先级降序存为三组并行元组：派发只遍历 _callables，
+        # _kinds 记录订阅时判定的监听器类型，供 emit_async 分派
+        self._callables: Dict[str, Tuple[Callable, ...]] = {}
+        self._priorities: Dict[str, Tuple[int, ...]] = {}
+        self._kinds: Dict[str, Tuple[int, ...]] = {}
+        self._wildcard_callables: Tuple[Callable, ...] = ()
+        self._wildcard_priorities: Tuple[int, ...] = ()
+        self._wildcard_kinds: Tuple[int, ...] = ()
+        # 派发表缓存：{event_name: 合并通配符后的监听器}，首次发布时生成；
+        # _dispatch_async 同时保存监听器类型，保证两者来自同一次生成
+        self._dispatch: Dict[str, Tuple[Callable, ...]] = {}
+        self._dispatch_async: Dict[str, Tuple[Tuple[Callable, ...], Tuple[int, ...]]] = {}
+        # 保护订阅变更与派发表生成（emit 命中缓存时不加锁）
+        self._lock = threading.Lock()
         self._middleware: List[Callable] = []
-        self._wildcard_listeners: List[tuple[Callable, int]] = []
+        # 专用有界线程池，emit_async 中的同步监听器在此执行
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ebus')
+        self._rebuild_emit()
 
     def subscribe(
         self,
@@ -117,34 +185,166 @@ class EventBus:
             listener: 监听器函数或对象
             priority: 优先级（数字越大越先执行）
         """
-        if event_name == "*":
-            self._wildcard_listeners.append((listener, priority))
-            self._wildcard_listeners.sort(key=lambda x: x[1], reverse=True)
-        else:
-            if event_name not in self._listeners:
-                self._listeners[event_name] = []
-            self._listeners[event_name].append((listener, priority))
-            self._listeners[event_name].sort(key=lambda x: x[1], reverse=True)
+        kind = _listener_kind(listener)
+        with self._lock:
+            if event_name == "*":
+                self._wildcard_callables, self._wildcard_priorities, self._wildcard_kinds = self._insert(
+                    self._wildcard_callables, self._wildcard_priorities, self._wildcard_kinds,
+                    listener, priority, kind
+                )
+            else:
+                self._callables[event_name], self._priorities[event_name], self._kinds[event_name] = self._insert(
+                    self._callables.get(event_name, ()),
+                    self._priorities.get(event_name, ()),
+                    self._kinds.get(event_name, ()),
+                    listener,
+                    priority,
+                    kind
+                )
+            self._invalidate_dispatch(event_name)
 
     def unsubscribe(self, event_name: str, listener: Callable) -> None:
         """取消订阅"""
+        with self._lock:
+            if event_name == "*":
+                self._wildcard_callables, self._wildcard_priorities, self._wildcard_kinds = self._remove(
+                    self._wildcard_callables, self._wildcard_priorities, self._wildcard_kinds, listener
+                )
+            else:
+                callables = self._callables.get(event_name)
+                if callables is not None:
+                    self._callables[event_name], self._priorities[event_name], self._kinds[event_name] = self._remove(
+                        callables, self._priorities[event_name], self._kinds[event_name], listener
+                    )
+            self._invalidate_dispatch(event_name)
+
+    def _invalidate_dispatch(self, event_name: str) -> None:
+        """订阅变更后使派发表缓存失效（通配符变更影响所有事件），调用方需持有 _lock"""
         if event_name == "*":
-            self._wildcard_listeners = [
-                (l, p) for l, p in self._wildcard_listeners if l != listener
-            ]
-        elif event_name in self._listeners:
-            self._listeners[event_name] = [
-                (l, p) for l, p in self._listeners[event_name] if l != listener
-            ]
+            self._dispatch.clear()
+            self._dispatch_async.clear()
+        else:
+            self._dispatch.pop(event_name, None)
+            self._dispatch_async.pop(event_name, None)
+
+    @staticmethod
+    def _insert(
+        callables: Tuple[Callable, ...],
+        priorities: Tuple[int, ...],
+        kinds: Tuple[int, ...],
+        listener: Callable,
+        priority: int,
+        kind: int
+    ) -> Tuple[Tuple[Callable, ...], Tuple[int, ...], Tuple[int, ...]]:
+        """按优先级插入监听器（同优先级保持订阅顺序）"""
+        index = len(priorities)
+        for i, p in enumerate(priorities):
+            if p < priority:
+                index = i
+                break
+        return (
+            callables[:index] + (listener,) + callables[index:],
+            priorities[:index] + (priority,) + priorities[index:],
+            kinds[:index] + (kind,) + kinds[index:]
+        )
+
+    @staticmethod
+    def _remove(
+        callables: Tuple[Callable, ...],
+        priorities: Tuple[int, ...],
+        kinds: Tuple[int, ...],
+        listener: Callable
+    ) -> Tuple[Tuple[Callable, ...], Tuple[int, ...], Tuple[int, ...]]:
+        """移除监听器"""
+        kept = [row for row in zip(callables, priorities, kinds) if row[0] != listener]
+        return (
+            tuple(l for l, _, _ in kept),
+            tuple(p for _, p, _ in kept),
+            tuple(k for _, _, k in kept)
+        )
+
+    def close(self, wait: bool = True) -> None:
+        """
+        关闭事件总线的线程池
+
+        关闭后 emit 仍可使用，emit_async 中的同步监听器将无法再调度
+
+        Args:
+            wait: 是否等待正在执行的同步监听器完成
+        """
+        self._pool.shutdown(wait=wait)
 
     def use_middleware(self, middleware: Callable[[Event], Event]) -> None:
         """添加中间件"""
         self._middleware.append(middleware)
+        self._rebuild_emit()
+
+    def _compile_dispatch(self, event_name: str) -> Tuple[Tuple[Callable, ...], Tuple[int, ...]]:
+        """
+        合并通配符与特定事件监听器，按优先级排序（同优先级时通配符在前）
+
+        返回 (监听器, 监听器类型)，结果缓存到 _dispatch / _dispatch_async，订阅变更时失效；
+        没有特定监听器的事件名直接使用通配符元组，不写入缓存。
+        生成与失效都在 _lock 内进行，避免并发订阅时把过期的派发表写回缓存
+        """
+        with self._lock:
+            entry = self._dispatch_async.get(event_name)
+            if entry is not None:
+                return entry
+
+            callables = self._callables.get(event_name)
+            if callables is None:
+                return self._wildcard_callables, self._wildcard_kinds
+
+            merged = list(heapq.merge(
+                zip(self._wildcard_callables, self._wildcard_priorities, self._wildcard_kinds),
+                zip(callables, self._priorities[event_name], self._kinds[event_name]),
+                key=lambda row: row[1],
+                reverse=True
+            ))
+            entry = (tuple(l for l, _, _ in merged), tuple(k for _, _, k in merged))
+            self._dispatch[event_name] = entry[0]
+            self._dispatch_async[event_name] = entry
+            return entry
+
+    def _rebuild_emit(self) -> None:
+        """
+        生成专用的 emit：没有中间件时省去中间件循环
+
+        在添加中间件时调用；子类重写了 emit 时保持不变
+        """
+        if type(self).emit is not EventBus.emit:
+            return
+
+        middleware = tuple(self._middleware)
+        get_dispatch = self._dispatch.get
+        compile_dispatch = self._compile_dispatch
+        execute = self._execute_listener
+
+        if middleware:
+            def emit(event: Event) -> List[Any]:
+                for m in middleware:
+                    event = m(event)
+                listeners = get_dispatch(event.name)
+                if listeners is None:
+                    listeners = compile_dispatch(event.name)[0]
+                return [execute(l, event) for l in listeners]
+        else:
+            def emit(event: Event) -> List[Any]:
+                listeners = get_dispatch(event.name)
+                if listeners is None:
+                    listeners = compile_dispatch(event.name)[0]
+                return [execute(l, event) for l in listeners]
+
+        emit.__doc__ = EventBus.emit.__doc__
+        self.emit = emit
 
     def emit(self, event: Event) -> List[Any]:
         """
         发布事件（同步）
 
+        实例上的 emit 会被 _rebuild_emit 替换为等价的专用版本
+
         Returns:
             所有监听器的返回值列表
         """
@@ -152,18 +352,12 @@ class EventBus:
         for middleware in self._middleware:
             event = middleware(event)
 
-        results = []
+        # 通配符与特定事件监听器按优先级合并后的派发表
+        listeners = self._dispatch.get(event.name)
+        if listeners is None:
+            listeners = self._compile_dispatch(event.name)[0]
 
-        # 执行通配符监听器
-        for listener, _ in self._wildcard_listeners:
-            results.append(self._execute_listener(listener, event))
-
-        # 执行特定事件监听器
-        if event.name in self._listeners:
-            for listener, _ in self._listeners[event.name]:
-                results.append(self._execute_listener(listener, event))
-
-        return results
+        return [self._execute_listener(listener, event) for listener in listeners]
 
     async def emit_async(self, event: Event) -> List[Any]:
         """发布事件（异步）"""
@@ -172,20 +366,26 @@ class EventBus:
             event = middleware(event)
 
         tasks = []
+        loop = asyncio.get_running_loop()
 
-        # 收集所有监听器
-        all_listeners = []
-        all_listeners.extend(self._wildcard_listeners)
-        if event.name in self._listeners:
-            all_listeners.extend(self._listeners[event.name])
+        # 收集所有监听器及其类型
+        name = event.name
+        entry = self._dispatch_async.get(name)
+        if entry is None:
+            entry = self._compile_dispatch(name)
+        all_listeners, all_kinds = entry
 
         # 并发执行
-        for listener, _ in all_listeners:
-            if asyncio.iscoroutinefunction(listener) or \
-               (hasattr(listener, 'handle') and asyncio.iscoroutinefunction(listener.handle)):
-                tasks.append(self._execute_listener_async(listener, event))
+        for listener, kind in zip(all_listeners, all_kinds):
+            if kind == _SYNC:
+                # 与 asyncio.to_thread 一致：在当前上下文副本中执行，保留 contextvars
+                tasks.append(loop.run_in_executor(
+                    self._pool, contextvars.copy_context().run, self._execute_listener, listener, event
+                ))
+            elif kind == _ASYNC_HANDLE:
+                tasks.append(self._execute_listener_async(listener.handle, event))
             else:
-                tasks.append(asyncio.to_thread(self._execute_listener, listener, event))
+                tasks.append(self._execute_listener_async(listener, event))
 
         return await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -198,10 +398,8 @@ class EventBus:
             return None
 
     async def _execute_listener_async(self, listener: Callable, event: Event) -> Any:
-        """异步执行单个监听器"""
+        """异步执行单个监听器（协程函数或 handle 方法）"""
         try:
-            if hasattr(listener, 'handle'):
-                return await listener.handle(event)
             return await listener(event)
         except Exception as e:
             print(f"Error in async listener {listener}: {e}")
@@ -239,11 +437,12 @@ def auto_register_listeners(module, bus: EventBus) -> None:
         module: Python模块对象
         bus: 事件总线实例
     """
-    for name in dir(module):
-        obj = getattr(module, name)
-        if hasattr(obj, '_event_name'):
+    # 直接遍历模块命名空间（按定义顺序），无需 dir() 排序和逐个 getattr
+    for obj in vars(module).values():
+        event_name = getattr(obj, '_event_name', None)
+        if event_name is not None:
             bus.subscribe(
-                obj._event_name,
+                event_name,
                 obj,
                 getattr(obj, '_event_priority', 0)
             )
\ No newline at end of file
@@ -5,29 +5,56 @@
 流转控制由 event.scope 负责
 """
 
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Tuple
+
 from .config_loader import config
 
 
+def _compile_prefixes(prefixes: Iterable[str]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    预处理前缀列表
+
+    形如 "admin." 的单级命名空间前缀转为集合，按首段做哈希查找；
+    其余前缀保留为元组，交给 str.startswith 匹配
+    """
+    namespaces = set()
+    others = []
+    for prefix in prefixes:
+        if prefix.endswith('.') and prefix.count('.') == 1:
+            namespaces.add(prefix[:-1])
+        else:
+            others.append(prefix)
+    return frozenset(namespaces), tuple(others)
+
+
+def _matches(event_name: str, namespaces: FrozenSet[str], others: Tuple[str, ...]) -> bool:
+    """事件名是否命中任一前缀"""
+    head, sep, _ = event_name.partition('.')
+    if sep and head in namespaces:
+        return True
+    return bool(others) and event_name.startswith(others)
+
+
+# 启动时解析一次前缀配置
+_BLOCKED_NAMESPACES, _BLOCKED_OTHERS = _compile_prefixes(config.security.blocked_prefixes or ())
+_SENSITIVE_NAMESPACES, _SENSITIVE_OTHERS = _compile_prefixes(config.security.sensitive_prefixes or ())
+
+
+@lru_cache(maxsize=2048)
 def can_receive_from_frontend(event_name: str) -> bool:
     """
     安全检查：前端是否允许发送此事件
 
     简单规则：只要不在黑名单就允许
     """
-    blocked_prefixes = config.security.blocked_prefixes or []
-    for prefix in blocked_prefixes:
-        if event_name.startswith(prefix):
-            return False
-    return True
+    return not _matches(event_name, _BLOCKED_NAMESPACES, _BLOCKED_OTHERS)
 
 
+@lru_cache(maxsize=2048)
 def is_sensitive_event(event_name: str) -> bool:
     """
     检查是否是敏感事件
     敏感事件建议使用 scope='local'
     """
-    sensitive_prefixes = config.security.sensitive_prefixes or []
-    for prefix in sensitive_prefixes:
-        if event_name.startswith(prefix):
-            return True
-    return False
\ No newline at end of file
+    return _matches(event_name, _SENSITIVE_NAMESPACES, _SENSITIVE_OTHERS)
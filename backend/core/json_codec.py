@@ -0,0 +1,43 @@
+"""
+JSON 编解码器 - 基于 orjson 的 json 模块替代品
+
+提供与标准库兼容的 dumps/loads，可传给 SocketIO(json=...)
+"""
+
+import json
+from typing import Any
+
+import orjson
+
+
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def dumps(obj: Any, **kwargs: Any) -> str:
+    """
+    序列化为 JSON 字符串
+
+    输出与标准库语义等价，但不保证逐字节一致：非 ASCII 字符直接输出为 UTF-8
+    而非 \\u 转义，浮点数格式也可能不同（如 1e16 输出为 1e16 而非 1e+16）；
+    NaN/Infinity 编码为 null（它们本就不是合法 JSON，前端也无法解析）。
+
+    以下情况交给标准库处理：
+    - 传入了除紧凑 separators 以外的参数（orjson 无法支持）
+    - orjson 编码失败（如超出 64 位的整数）
+    """
+    if set(kwargs) - {'separators'} or tuple(kwargs.get('separators', ())) != _COMPACT_SEPARATORS:
+        return json.dumps(obj, **kwargs)
+
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(obj, **kwargs)
+
+
+def loads(s: Any, **kwargs: Any) -> Any:
+    """
+    反序列化 JSON 字符串或字节
+
+    使用标准库：orjson 会把超出 64 位的整数解析为浮点数，且不接受 NaN/Infinity
+    """
+    return json.loads(s, **kwargs)
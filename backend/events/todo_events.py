@@ -4,6 +4,7 @@ Todo 应用事件定义 - 实际应用示例
 
 from core.event import Event, on_event
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Dict, Any
 
 
@@ -64,8 +65,6 @@ def save_todo_to_db(event: Event):
 @on_event("todo.created", priority=5)
 def broadcast_new_todo(event: Event):
     """请求广播新 Todo 给所有客户端"""
-    from datetime import datetime
-
     # 获取刚创建的 Todo ID（从高优先级监听器返回值）
     # 这里简化处理，直接从数据库获取最新的
     if todos_db:
@@ -94,8 +93,6 @@ def broadcast_new_todo(event: Event):
 @on_event("todo.completed")
 def mark_todo_completed(event: Event):
     """标记 Todo 为已完成"""
-    from datetime import datetime
-
     todo_id = event.data.get("id")
 
     if todo_id in todos_db:
@@ -123,8 +120,6 @@ def mark_todo_completed(event: Event):
 @on_event("todo.deleted")
 def delete_todo_from_db(event: Event):
     """从数据库删除 Todo"""
-    from datetime import datetime
-
     todo_id = event.data.get("id")
 
     if todo_id in todos_db: